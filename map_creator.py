@@ -1,24 +1,267 @@
 import tkinter as tk
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import count
+from operator import attrgetter
 from tkinter import filedialog, messagebox, ttk
 
 # WARNING: this was entirely produced by an LLM, and not checked for correctness.
 # This is only a helper tool to quickly develop new maps. You have been warned.
 
+SPAWN_RADIUS = 10
+
+# Largest accepted map side in pixels, bounds the wall bitmap allocation
+MAX_MAP_SIZE = 4096
+
+# 5x7 pixel glyphs stamped onto the spawn marker icons
+SPAWN_GLYPHS = {
+    "R": ("11110", "10001", "10001", "11110", "10100", "10010", "10001"),
+    "B": ("11110", "10001", "10001", "11110", "10001", "10001", "11110"),
+}
+
+
+def make_spawn_icon(master, color, letter, r=SPAWN_RADIUS):
+    """Renders a filled, outlined circle with a white letter into a PhotoImage."""
+    size = 2 * r + 1
+    icon = tk.PhotoImage(master=master, width=size, height=size)
+
+    # Draw the circle row by row; pixels that are never put stay transparent
+    for dy in range(-r, r + 1):
+        half = int((r * r - dy * dy) ** 0.5)
+        y = r + dy
+        icon.put("black", to=(r - half, y, r + half + 1, y + 1))
+        if abs(dy) < r - 1:
+            inner = int(((r - 1) ** 2 - dy * dy) ** 0.5)
+            icon.put(color, to=(r - inner, y, r + inner + 1, y + 1))
+
+    glyph = SPAWN_GLYPHS[letter]
+    left = r - len(glyph[0]) // 2
+    top = r - len(glyph) // 2
+    for row, bits in enumerate(glyph):
+        for col, bit in enumerate(bits):
+            if bit == "1":
+                icon.put("white", (left + col, top + row))
+
+    return icon
+
+
+# Static export boilerplate around the wall and spawn point entries
+MAP_HEADER_TMPL = (
+    "MapDefinition {{\n"
+    "    width: {:.1f},\n"
+    "    height: {:.1f},\n"
+    "    walls: vec!["
+)
+WALLS_END = "    ],"
+SPAWNS_HEADER = "    spawn_points: vec!["
+MAP_FOOTER = "    ],\n}"
+
+# Export templates, one formatted entry per wall / spawn point
+WALL_TMPL = (
+    "        RectWall {{\n"
+    "            min: ({:.1f}, {:.1f}).into(),\n"
+    "            max: ({:.1f}, {:.1f}).into(),\n"
+    "        }},"
+)
+# Team must be capitalized like the enum: Team::Red, Team::Blue
+SPAWN_TMPL = "        (Team::{}, ({:.1f}, {:.1f}).into()),"
+
+
+def intersect(a, b):
+    """Intersects two pixel regions (x2/y2 exclusive), None if they don't overlap."""
+    x1 = max(a[0], b[0])
+    y1 = max(a[1], b[1])
+    x2 = min(a[2], b[2])
+    y2 = min(a[3], b[3])
+    return (x1, y1, x2, y2) if x1 < x2 and y1 < y2 else None
+
+
+# Compared by identity so each wall can key the quadtree
+@dataclass(slots=True, eq=False)
+class Wall:
+    x1: float
+    y1: float
+    x2: float
+    y2: float
+    seq: int = 0  # creation order, later walls are painted on top
+
+    @property
+    def rect(self):
+        return (self.x1, self.y1, self.x2, self.y2)
+
+
+@dataclass(slots=True)
+class Spawn:
+    id: int  # canvas item id
+    x: float
+    y: float
+    team: str  # "Red" | "Blue"
+
+
+def write_text_file(file_path, text):
+    with open(file_path, "w") as f:
+        f.write(text)
+
+
+class Quadtree:
+    """PR-quadtree indexing wall rectangles for point queries.
+
+    A rectangle is kept in the deepest node where it does not straddle a
+    quadrant midline, so a point query only walks a single root-to-leaf path.
+    """
+
+    MAX_DEPTH = 8
+
+    def __init__(self, bounds, capacity=8, depth=0):
+        self.bounds = bounds  # (x1, y1, x2, y2)
+        self.capacity = capacity
+        self.depth = depth
+        self.items = []  # (key, (x1, y1, x2, y2)) pairs
+        self.children = None  # [top-left, top-right, bottom-left, bottom-right]
+
+    def _midpoint(self):
+        bx1, by1, bx2, by2 = self.bounds
+        return (bx1 + bx2) / 2, (by1 + by2) / 2
+
+    def _child_for(self, rect):
+        """Returns the child quadrant for rect, or None if it straddles a midline."""
+        x1, y1, x2, y2 = rect
+        mx, my = self._midpoint()
+        if x2 < mx:
+            col = 0
+        elif x1 >= mx:
+            col = 1
+        else:
+            return None
+        if y2 < my:
+            row = 0
+        elif y1 >= my:
+            row = 1
+        else:
+            return None
+        return self.children[row * 2 + col]
+
+    def _split(self):
+        bx1, by1, bx2, by2 = self.bounds
+        mx, my = self._midpoint()
+        depth = self.depth + 1
+        self.children = [
+            Quadtree((bx1, by1, mx, my), self.capacity, depth),
+            Quadtree((mx, by1, bx2, my), self.capacity, depth),
+            Quadtree((bx1, my, mx, by2), self.capacity, depth),
+            Quadtree((mx, my, bx2, by2), self.capacity, depth),
+        ]
+        items = self.items
+        self.items = []
+        for key, rect in items:
+            self.insert(key, rect)
+
+    def insert(self, key, rect):
+        if self.children is not None:
+            child = self._child_for(rect)
+            if child is not None:
+                child.insert(key, rect)
+                return
+
+        self.items.append((key, rect))
+        if (
+            self.children is None
+            and len(self.items) > self.capacity
+            and self.depth < self.MAX_DEPTH
+        ):
+            self._split()
+
+    def remove(self, key, rect):
+        node = self
+        while node.children is not None:
+            child = node._child_for(rect)
+            if child is None:
+                break
+            node = child
+
+        for i, (item_key, _) in enumerate(node.items):
+            if item_key == key:
+                del node.items[i]
+                return
+
+    def query(self, x, y):
+        """Returns the keys of all rectangles containing the point (x, y)."""
+        found = []
+        node = self
+        while True:
+            for key, (x1, y1, x2, y2) in node.items:
+                if x1 <= x <= x2 and y1 <= y <= y2:
+                    found.append(key)
+            if node.children is None:
+                return found
+            mx, my = node._midpoint()
+            node = node.children[(y >= my) * 2 + (x >= mx)]
+
+    def query_rect(self, rect):
+        """Returns the keys of all rectangles overlapping rect, edges inclusive."""
+        x1, y1, x2, y2 = rect
+        found = []
+        nodes = [self]
+        while nodes:
+            node = nodes.pop()
+            for key, (ix1, iy1, ix2, iy2) in node.items:
+                if ix1 <= x2 and x1 <= ix2 and iy1 <= y2 and y1 <= iy2:
+                    found.append(key)
+            if node.children is None:
+                continue
+            mx, my = node._midpoint()
+            top_left, top_right, bottom_left, bottom_right = node.children
+            if y1 < my:
+                if x1 < mx:
+                    nodes.append(top_left)
+                if x2 >= mx:
+                    nodes.append(top_right)
+            if y2 >= my:
+                if x1 < mx:
+                    nodes.append(bottom_left)
+                if x2 >= mx:
+                    nodes.append(bottom_right)
+        return found
+
 
 class MapEditor:
+    # Team -> (marker color, marker letter)
+    TEAM_STYLE = {"Red": ("red", "R"), "Blue": ("blue", "B")}
+
     def __init__(self, root):
         self.root = root
         self.root.title("2D Map Builder")
 
         # Data Storage
-        self.walls = []  # Stores dicts: {'id': canvas_id, 'min': (x,y), 'max': (x,y)}
-        # Updated spawn storage: {'ids': [canvas_ids], 'pos': (x,y), 'team': 'Red'|'Blue'}
-        self.spawns = []
+        self.walls = []  # Stores Wall records
+        self.spawns = []  # Stores Spawn records
+        # Chronological undo history of ("wall"|"spawn", record) tuples
+        self.history = deque(maxlen=10000)
+        # Map size as last applied by update_canvas_size, matches what is drawn
+        self._map_w = 0
+        self._map_h = 0
+        # Spatial index of wall rectangles keyed by Wall record
+        self._qt = Quadtree((0, 0, 0, 0))
+        self._wall_seq = count()
 
         self.current_tool = "wall"  # "wall" or "spawn"
-        self.start_x = None
-        self.start_y = None
+        self._drag_base = None  # (x, y) corner where the current wall drag started
         self.current_rect = None
+        # Latest drag position waiting to be flushed on the next idle cycle
+        self._pending_drag = None
+        # Background worker for export file writes, keeps the UI responsive
+        self._io = ThreadPoolExecutor(max_workers=1)
+
+        # Finished walls are composited into one opaque bitmap, which also serves
+        # as the white map area, shown as a single image item
+        self._wall_layer = tk.PhotoImage(master=root)
+
+        # Spawn markers are pre-rendered once and stamped with create_image
+        self._spawn_icon = {
+            team: make_spawn_icon(root, color, letter)
+            for team, (color, letter) in self.TEAM_STYLE.items()
+        }
 
         # --- UI Layout ---
 
@@ -79,7 +322,7 @@ class MapEditor:
         self.team_combobox = ttk.Combobox(
             self.controls_frame,
             textvariable=self.team_var,
-            values=("Red", "Blue"),
+            values=tuple(self.TEAM_STYLE),
             state="readonly",
         )
         self.team_combobox.pack(fill=tk.X)
@@ -137,9 +380,17 @@ class MapEditor:
         # Bind the configure event to recenter the view when the window is resized
         self.canvas.bind("<Configure>", self.recenter_viewport)
 
+        # Stop the export worker when the window is closed
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
         # Initialize
         self.update_canvas_size()
 
+    def on_close(self):
+        # A write already in progress still finishes before the interpreter exits
+        self._io.shutdown(wait=False)
+        self.root.destroy()
+
     def set_tool(self):
         self.current_tool = self.tool_var.get()
 
@@ -147,8 +398,8 @@ class MapEditor:
         """Adjusts the viewport to try and center the scrollregion if the canvas is larger."""
 
         try:
-            map_w = int(self.entry_width.get())
-            map_h = int(self.entry_height.get())
+            map_w = self._map_w
+            map_h = self._map_h
 
             canvas_w = self.canvas.winfo_width()
             canvas_h = self.canvas.winfo_height()
@@ -179,86 +430,98 @@ class MapEditor:
             else:
                 self.canvas.yview_moveto(0.0)
 
-        except (ValueError, ZeroDivisionError):
-            # Ignore if size entries are not valid integers or zero
+        except ZeroDivisionError:
+            # Ignore if the map size is zero
             pass
 
+    def read_map_size(self):
+        """Parses the size entries, raising ValueError unless both are in range."""
+        w = int(self.entry_width.get())
+        h = int(self.entry_height.get())
+        if not (0 < w <= MAX_MAP_SIZE and 0 < h <= MAX_MAP_SIZE):
+            raise ValueError(f"map size {w}x{h} out of range")
+        return w, h
+
     def update_canvas_size(self):
         try:
-            w = int(self.entry_width.get())
-            h = int(self.entry_height.get())
-
-            # Set the scroll region to the size of the map (0, 0, w, h).
-            # The centering logic in recenter_viewport will handle the offsets.
-            self.canvas.config(scrollregion=(0, 0, w, h))
-
-            # Draw a visual container (Map Area) inside the larger scrollable canvas.
-            self.canvas.delete("map_area")
-            map_area_id = self.canvas.create_rectangle(
-                0, 0, w, h, fill="white", outline="black", width=1, tags=("map_area")
+            w, h = self.read_map_size()
+            # Resize the wall bitmap first so nothing has changed if it fails
+            self._wall_layer.configure(width=w, height=h)
+        except ValueError:
+            messagebox.showerror(
+                "Error",
+                f"Width and Height must be integers between 1 and {MAX_MAP_SIZE}.",
             )
+            return
+        except tk.TclError as e:
+            messagebox.showerror("Error", f"Failed to resize the map: {e}")
+            return
 
-            # Draw a border guide
-            self.canvas.delete("border")
-            self.canvas.create_rectangle(
-                0, 0, w, h, outline="red", width=2, tags="border"
-            )
+        old_w, old_h = self._map_w, self._map_h
+        self._map_w, self._map_h = w, h
 
-            # Re-draw all existing walls and spawns to be on top of the new map_area background
-            self.redraw_objects()
+        # Rebuild the wall index for the new map bounds
+        self._qt = Quadtree((0, 0, w, h))
+        for wall in self.walls:
+            self._qt.insert(wall, wall.rect)
+
+        # Set the scroll region to the size of the map (0, 0, w, h).
+        # The centering logic in recenter_viewport will handle the offsets.
+        self.canvas.config(scrollregion=(0, 0, w, h))
+
+        # Draw a border guide
+        self.canvas.delete("border")
+        self.canvas.create_rectangle(0, 0, w, h, outline="red", width=2, tags="border")
+
+        # configure() keeps the pixels both sizes share, so only the strips that
+        # changed are repainted. They start one pixel inside the shared area,
+        # where walls clipped at the old or new edge draw their outline.
+        if w != old_w:
+            self.repaint_region((min(w, old_w) - 1, 0, w, h))
+        if h != old_h:
+            self.repaint_region((0, min(h, old_h) - 1, w, h))
+        self.canvas.delete("wall_layer")
+        self.canvas.create_image(
+            0, 0, anchor="nw", image=self._wall_layer, tags="wall_layer"
+        )
 
-            # Call recenter function to position the map drawing in the center of the viewport
-            # Use self.root.after(10, ...) to ensure the canvas has updated its size (winfo_width)
-            self.root.after(10, self.recenter_viewport)
+        # Keep existing spawns on top, with the border guide over the wall bitmap
+        self.canvas.tag_lower("border")
+        self.canvas.tag_lower("wall_layer")
+
+        # Call recenter function to position the map drawing in the center of the viewport
+        # Flush pending geometry first so winfo_width/height are up to date
+        self.canvas.update_idletasks()
+        self.recenter_viewport()
+
+    def wall_pixels(self, wall):
+        """Returns the pixel region a wall covers in the bitmap, or None."""
+        # Clip to the bitmap, walls can lie outside after the map shrinks
+        x1, y1, x2, y2 = (round(v) for v in wall.rect)
+        return intersect((x1, y1, x2 + 1, y2 + 1), (0, 0, self._map_w, self._map_h))
+
+    def paint_wall(self, wall, clip=None):
+        """Draws a wall (gray fill, black outline) into the wall bitmap, within clip."""
+        region = self.wall_pixels(wall)
+        if region is None:
+            return
+        x1, y1, x2, y2 = region
+        fill = (x1 + 1, y1 + 1, x2 - 1, y2 - 1)
+        if clip is not None:
+            region = intersect(region, clip)
+            if region is None:
+                return
 
-        except ValueError:
-            messagebox.showerror("Error", "Width and Height must be integers.")
-
-    def redraw_objects(self):
-        """Utility to redraw existing objects after canvas changes."""
-        # Collect and redraw walls
-        temp_walls = self.walls[:]
-        self.walls = []
-        for wall in temp_walls:
-            self.canvas.delete(wall["id"])
-            x1, y1 = wall["min"]
-            x2, y2 = wall["max"]
-            rect_id = self.canvas.create_rectangle(
-                x1, y1, x2, y2, outline="black", fill="gray"
-            )
-            self.walls.append({"id": rect_id, "min": (x1, y1), "max": (x2, y2)})
-
-        # Collect and redraw spawns
-        temp_spawns = self.spawns[:]
-        self.spawns = []
-        for spawn in temp_spawns:
-            for visual_id in spawn["ids"]:
-                self.canvas.delete(visual_id)
-
-            canvas_x, canvas_y = spawn["pos"]
-            team = spawn["team"]
-
-            r = 10  # radius
-            color = "red" if team == "Red" else "blue"
-
-            item_id = self.canvas.create_oval(
-                canvas_x - r,
-                canvas_y - r,
-                canvas_x + r,
-                canvas_y + r,
-                fill=color,
-                outline="black",
-            )
-            text_id = self.canvas.create_text(
-                canvas_x, canvas_y, text=team[0].upper(), fill="white"
-            )
-            self.spawns.append(
-                {
-                    "ids": [item_id, text_id],
-                    "pos": (canvas_x, canvas_y),
-                    "team": team,
-                }
-            )
+        self._wall_layer.put("black", to=region)
+        fill = intersect(fill, region)
+        if fill is not None:
+            self._wall_layer.put("gray", to=fill)
+
+    def render_walls(self):
+        """Repaints the wall bitmap from scratch."""
+        self._wall_layer.put("white", to=(0, 0, self._map_w, self._map_h))
+        for wall in self.walls:
+            self.paint_wall(wall)
 
     def on_mouse_down(self, event):
         # Convert window coords to canvas coords (handling scroll)
@@ -266,166 +529,146 @@ class MapEditor:
         canvas_y = self.canvas.canvasy(event.y)
 
         # Check if click is outside map boundaries
-        try:
-            map_w = int(self.entry_width.get())
-            map_h = int(self.entry_height.get())
-            if not (0 <= canvas_x <= map_w and 0 <= canvas_y <= map_h):
-                # Ignore click if outside the defined map area
-                return
-        except ValueError:
+        if not (0 <= canvas_x <= self._map_w and 0 <= canvas_y <= self._map_h):
+            # Ignore click if outside the defined map area
             return
 
         if self.current_tool == "wall":
-            self.start_x = canvas_x
-            self.start_y = canvas_y
-            # Create a temporary rectangle
+            self._drag_base = (canvas_x, canvas_y)
+            # Create a temporary outline-only rubber band, replaced by the bitmap wall
             self.current_rect = self.canvas.create_rectangle(
-                self.start_x,
-                self.start_y,
-                self.start_x,
-                self.start_y,
-                outline="black",
-                fill="gray",
-                stipple="gray50",
+                canvas_x, canvas_y, canvas_x, canvas_y, outline="black", fill=""
             )
         elif self.current_tool == "spawn":
             team = self.team_var.get()
-            color = "red" if team == "Red" else "blue"
-
-            # Create a spawn point (circle)
-            r = 10  # radius
-            item_id = self.canvas.create_oval(
-                canvas_x - r,
-                canvas_y - r,
-                canvas_x + r,
-                canvas_y + r,
-                fill=color,  # Use team color
-                outline="black",
-            )
-            # Add text label (R or B)
-            text_id = self.canvas.create_text(
-                canvas_x, canvas_y, text=team[0].upper(), fill="white"  # 'R' or 'B'
-            )
 
-            self.spawns.append(
-                {
-                    "ids": [item_id, text_id],  # Store both visual elements
-                    "pos": (canvas_x, canvas_y),
-                    "team": team,  # Store the team
-                }
+            # Create a spawn point (pre-rendered circle with R or B)
+            item_id = self.canvas.create_image(
+                canvas_x, canvas_y, image=self._spawn_icon[team], tags=("spawn",)
             )
 
+            spawn = Spawn(item_id, canvas_x, canvas_y, team)
+            self.spawns.append(spawn)
+            self.history.append(("spawn", spawn))
+
     def on_mouse_drag(self, event):
         if self.current_tool == "wall" and self.current_rect:
-            cur_x = self.canvas.canvasx(event.x)
-            cur_y = self.canvas.canvasy(event.y)
-            self.canvas.coords(
-                self.current_rect, self.start_x, self.start_y, cur_x, cur_y
+            # Coalesce motion events: only the latest position is drawn per idle cycle
+            if self._pending_drag is None:
+                self.root.after_idle(self._flush_drag)
+            self._pending_drag = (
+                self.canvas.canvasx(event.x),
+                self.canvas.canvasy(event.y),
             )
 
+    def _flush_drag(self):
+        pending = self._pending_drag
+        self._pending_drag = None
+        rect = self.current_rect
+        if pending is not None and rect:
+            self.canvas.coords(rect, *self._drag_base, *pending)
+
     def on_mouse_up(self, event):
         if self.current_tool == "wall" and self.current_rect:
             cur_x = self.canvas.canvasx(event.x)
             cur_y = self.canvas.canvasy(event.y)
+            # The final coords are set below, drop any unflushed drag position
+            self._pending_drag = None
 
             # Normalize coordinates (ensure min is always top-left)
-            x1, x2 = sorted([self.start_x, cur_x])
-            y1, y2 = sorted([self.start_y, cur_y])
+            x0, y0 = self._drag_base
+            x1, x2 = (x0, cur_x) if x0 < cur_x else (cur_x, x0)
+            y1, y2 = (y0, cur_y) if y0 < cur_y else (cur_y, y0)
 
             # Clamp coordinates to map boundaries
-            try:
-                map_w = int(self.entry_width.get())
-                map_h = int(self.entry_height.get())
-
-                x1 = max(0.0, min(x1, map_w))
-                x2 = max(0.0, min(x2, map_w))
-                y1 = max(0.0, min(y1, map_h))
-                y2 = max(0.0, min(y2, map_h))
-            except ValueError:
-                # If width/height are invalid, don't clamp
-                pass
-
-            # Update the temporary rectangle's final position with clamped/normalized values
-            self.canvas.coords(self.current_rect, x1, y1, x2, y2)
+            map_w = self._map_w
+            map_h = self._map_h
+            x1 = 0.0 if x1 < 0 else (map_w if x1 > map_w else x1)
+            x2 = 0.0 if x2 < 0 else (map_w if x2 > map_w else x2)
+            y1 = 0.0 if y1 < 0 else (map_h if y1 > map_h else y1)
+            y2 = 0.0 if y2 < 0 else (map_h if y2 > map_h else y2)
 
             # Store the wall data
-            self.walls.append(
-                {"id": self.current_rect, "min": (x1, y1), "max": (x2, y2)}
-            )
+            wall = Wall(x1, y1, x2, y2, next(self._wall_seq))
+            self.walls.append(wall)
+            self.history.append(("wall", wall))
+            self._qt.insert(wall, wall.rect)
 
-            # Ensure the rectangle is drawn solid now that drawing is complete
-            self.canvas.itemconfig(self.current_rect, fill="gray", stipple="")
+            # Drawing is complete, replace the rubber band with the bitmap wall
+            self.canvas.delete(self.current_rect)
             self.current_rect = None
+            self.paint_wall(wall)
+
+    def erase_wall(self, wall):
+        """Repaints the bitmap under a removed wall from the walls overlapping it."""
+        region = self.wall_pixels(wall)
+        if region is not None:
+            self.repaint_region(region)
+
+    def repaint_region(self, region):
+        """Repaints a pixel region of the wall bitmap from the walls overlapping it."""
+        region = intersect(region, (0, 0, self._map_w, self._map_h))
+        if region is None:
+            return
+        self._wall_layer.put("white", to=region)
+
+        # Query with a one pixel margin so walls that only touch after rounding
+        # are repainted too, in creation order to keep the original stacking
+        x1, y1, x2, y2 = region
+        neighbours = self._qt.query_rect((x1 - 1, y1 - 1, x2, y2))
+        for other in sorted(neighbours, key=attrgetter("seq")):
+            self.paint_wall(other, region)
+
+    def find_walls(self, x, y):
+        """Returns the Wall records containing the map point (x, y)."""
+        return self._qt.query(x, y)
 
     def undo_last(self):
-        # Determine which list to pop from based on what was added last?
-        # For simplicity, we undo based on the currently selected tool,
-        # or we could track a global history. Let's try global history simply:
-        # Actually, let's just undo based on current tool mode for specific utility.
-
-        if self.current_tool == "wall" and self.walls:
-            last = self.walls.pop()
-            self.canvas.delete(last["id"])
-        elif self.current_tool == "spawn" and self.spawns:
-            last = self.spawns.pop()
-            for visual_id in last["ids"]:
-                self.canvas.delete(visual_id)
+        if not self.history:
+            return
+
+        # The last record of each kind is always at the end of its list,
+        # so popping both the history and the list is O(1)
+        kind, last = self.history.pop()
+        if kind == "wall":
+            self.walls.pop()
+            self._qt.remove(last, last.rect)
+            self.erase_wall(last)
         else:
-            # If nothing in current tool, try the other just in case user forgot
-            if self.walls:
-                last = self.walls.pop()
-                self.canvas.delete(last["id"])
-            elif self.spawns:
-                last = self.spawns.pop()
-                for visual_id in last["ids"]:
-                    self.canvas.delete(visual_id)
+            self.spawns.pop()
+            self.canvas.delete(last.id)
 
     def clear_all(self):
         if messagebox.askyesno("Confirm", "Clear entire map?"):
-            self.canvas.delete("all")
-            self.walls = []
-            self.spawns = []
-            self.update_canvas_size()  # Redraw border and map area
+            # Border and wall layer items stay, only their contents go
+            self.canvas.delete("spawn")
+            self.walls.clear()
+            self.spawns.clear()
+            self.history.clear()
+            self._qt = Quadtree(self._qt.bounds)
+            self.render_walls()
 
     def export_map(self):
         # Generate the string
-        w = self.entry_width.get()
-        h = self.entry_height.get()
-
-        output = []
-
-        # Start Map Definition
-        output.append("MapDefinition {")
-        output.append(f"    width: {float(w):.1f},")
-        output.append(f"    height: {float(h):.1f},")
-        output.append("    walls: vec![")
-
-        # Walls
-        for wall in self.walls:
-            output.append("        RectWall {")
-            output.append(
-                f"            min: ({wall['min'][0]:.1f}, {wall['min'][1]:.1f}).into(),"
-            )
-            output.append(
-                f"            max: ({wall['max'][0]:.1f}, {wall['max'][1]:.1f}).into(),"
-            )
-            output.append("        },")
-
-        output.append("    ],")  # End walls vec
-
-        # Spawn Points
-        output.append("    spawn_points: vec![")
-        for spawn in self.spawns:
-            # Team must be capitalized like the enum: Team::Red, Team::Blue
-            team_str = f"Team::{spawn['team']}"
-            output.append(
-                f"        ({team_str}, ({spawn['pos'][0]:.1f}, {spawn['pos'][1]:.1f}).into()),"
-            )
-        output.append("    ],")  # End spawn_points vec
-
-        output.append("}")  # End MapDefinition struct
-
-        full_text = "\n".join(output)
+        w = self._map_w
+        h = self._map_h
+
+        full_text = "\n".join(
+            [
+                MAP_HEADER_TMPL.format(w, h),
+                *(
+                    WALL_TMPL.format(wall.x1, wall.y1, wall.x2, wall.y2)
+                    for wall in self.walls
+                ),
+                WALLS_END,
+                SPAWNS_HEADER,
+                *(
+                    SPAWN_TMPL.format(spawn.team, spawn.x, spawn.y)
+                    for spawn in self.spawns
+                ),
+                MAP_FOOTER,
+            ]
+        )
 
         # Save to file
         file_path = filedialog.asksaveasfilename(
@@ -438,12 +681,21 @@ class MapEditor:
         )
 
         if file_path:
-            try:
-                with open(file_path, "w") as f:
-                    f.write(full_text)
-                messagebox.showinfo("Success", f"Map saved to {file_path}")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to save file: {e}")
+            future = self._io.submit(write_text_file, file_path, full_text)
+            self.root.after(50, self._poll_export, future, file_path)
+
+    def _poll_export(self, future, file_path):
+        """Waits for a background export on the Tk main thread, then reports it."""
+        # Tk is not thread-safe, so the worker never touches it; poll from here
+        if not future.done():
+            self.root.after(50, self._poll_export, future, file_path)
+            return
+
+        e = future.exception()
+        if e is None:
+            messagebox.showinfo("Success", f"Map saved to {file_path}")
+        else:
+            messagebox.showerror("Error", f"Failed to save file: {e}")
 
 
 if __name__ == "__main__":